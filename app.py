@@ -1,20 +1,37 @@
 import os
+from dotenv import load_dotenv
+
+# Cooperative I/O must be patched in before anything opens a socket, so the
+# async mode is read here rather than from config; .env is loaded first so
+# both see the same value.
+load_dotenv()
+if os.getenv('SOCKETIO_ASYNC_MODE') == 'gevent':
+    from gevent import monkey
+    monkey.patch_all()
+
+import atexit
+import math
+import queue
 import socket
 import sys
-import traceback
+import time
 import logging
-from logging.handlers import RotatingFileHandler
-from flask import Flask, render_template, jsonify, request
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
+from flask import Flask, Response, g, render_template, jsonify, request
 from config import config
-from extensions import db, login_manager, limiter, cache, socketio
-from models import Issue, User
-from geoalchemy2.functions import ST_DWithin, ST_GeogFromText
-from sqlalchemy import inspect, text
+from extensions import OrjsonProvider, db, migrate, login_manager, limiter, cache, socketio
+from models import VALID_CATEGORIES, Issue, User, check_issue_fields, password_hasher
+from geoalchemy2 import Geography, alembic_helpers
+from geoalchemy2.functions import ST_DWithin
+from redis.exceptions import RedisError
+from sqlalchemy import func, insert, select, text
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 from sqlalchemy.exc import SQLAlchemyError
 
 def create_app(config_class=config):
     app = Flask(__name__)
     app.config.from_object(config_class)
+    app.json = OrjsonProvider(app)
 
     # Force PostgreSQL to use pg8000 dialect
     if app.config['SQLALCHEMY_DATABASE_URI'] and app.config['SQLALCHEMY_DATABASE_URI'].startswith('postgresql://'):
@@ -24,13 +41,28 @@ def create_app(config_class=config):
 
     # Initialize extensions
     db.init_app(app)
+    migrate.init_app(
+        app, db,
+        include_object=alembic_helpers.include_object,
+        render_item=alembic_helpers.render_item
+    )
     login_manager.init_app(app)
     
-    # Initialize limiter (for development, in-memory storage is automatic)
+    # Initialize limiter (shared Redis counters when REDIS_URL is set, in-memory otherwise)
     limiter.init_app(app)
     
     cache.init_app(app)
-    socketio.init_app(app, async_mode='threading')
+
+    if app.config['SOCKETIO_ASYNC_MODE'] == 'gevent':
+        from gevent import monkey
+        if not monkey.is_module_patched('socket'):
+            # Unpatched pg8000 sockets would block the hub and serialize every request
+            raise RuntimeError("SOCKETIO_ASYNC_MODE is 'gevent' but the process was not monkey-patched")
+    socketio.init_app(
+        app,
+        async_mode=app.config['SOCKETIO_ASYNC_MODE'],
+        message_queue=app.config['SOCKETIO_MESSAGE_QUEUE']
+    )
 
     # Setup logging for production
     def setup_logging():
@@ -39,12 +71,19 @@ def create_app(config_class=config):
             if not os.path.exists('logs'):
                 os.mkdir('logs')
                 
-            file_handler = RotatingFileHandler('logs/civictrack.log', maxBytes=10240, backupCount=10)
+            file_handler = RotatingFileHandler('logs/civictrack.log', maxBytes=5 * 1024 * 1024, backupCount=5)
             file_handler.setFormatter(logging.Formatter(
                 '%(asctime)s %(levelname)s: %(message)s [in %(pathname)s:%(lineno)d]'
             ))
             file_handler.setLevel(logging.INFO)
-            app.logger.addHandler(file_handler)
+
+            # Request threads only enqueue records; the listener thread owns the file
+            log_queue = queue.Queue(-1)
+            listener = QueueListener(log_queue, file_handler, respect_handler_level=True)
+            listener.start()
+            atexit.register(listener.stop)
+
+            app.logger.addHandler(QueueHandler(log_queue))
             app.logger.setLevel(logging.INFO)
             app.logger.info('CivicTrack startup')
 
@@ -55,37 +94,107 @@ def create_app(config_class=config):
     def index():
         return render_template('index.html')
 
+    def issues_query_args():
+        lat = float(request.args.get('lat', 12.9716))
+        lng = float(request.args.get('lng', 77.5946))
+        radius = float(request.args.get('radius', 5))
+        category = request.args.get('category')
+
+        # Reject bad input here so it never costs a database round-trip
+        if not (-90 <= lat <= 90 and -180 <= lng <= 180):
+            raise ValueError("Coordinates out of valid range (-90 to 90 lat, -180 to 180 lng)")
+        if not math.isfinite(radius):
+            raise ValueError("Radius must be a finite number")
+        if category and category not in VALID_CATEGORIES:
+            raise ValueError(f"Invalid category: {category}")
+
+        # Cap the search at 50km so no request can scan the whole table
+        radius = min(max(radius, 0.01), 50) * 1000
+
+        # Snap to a ~100m grid so nearby map pans share a cache entry
+        return round(lat, 3), round(lng, 3), radius, request.args.get('status'), category
+
+    def issues_cache_version():
+        # Bumped on every new issue, orphaning stale entries. The version is a
+        # timestamp stored without expiry, so even if the backend evicts it a
+        # fresh one is minted rather than an old key being reused.
+        version = cache.get('issues:ver')
+        if version is None:
+            version = time.time_ns()
+            cache.set('issues:ver', version, timeout=0)
+        return version
+
+    def issues_cache_key():
+        if 'issues_cache_key' not in g:
+            lat, lng, radius, status, category = issues_query_args()
+            # An unreachable cache only disables caching; the query still runs
+            try:
+                version = issues_cache_version()
+            except RedisError:
+                app.logger.warning("Issues cache unavailable", exc_info=True)
+                version = None
+            g.issues_cache_key = (
+                f"issues:{version}:{lat}:{lng}:{radius}:{status}:{category}" if version is not None else None
+            )
+        return g.issues_cache_key
+
+    def cached_issues_body():
+        # Fetched once per request, whether the limiter or the view asks first
+        if 'issues_cached_body' not in g:
+            g.issues_cached_body = None
+            if cache_key := issues_cache_key():
+                try:
+                    g.issues_cached_body = cache.get(cache_key)
+                except RedisError:
+                    app.logger.warning("Issues cache unavailable", exc_info=True)
+        return g.issues_cached_body
+
+    def issues_cache_hit():
+        # Cached reads never reach the database, so they don't count against the limit
+        try:
+            return cached_issues_body() is not None
+        except ValueError:
+            return False
+
     @app.route('/api/issues', methods=['GET'])
-    @limiter.limit("100/minute")
+    @limiter.limit("100/minute", exempt_when=issues_cache_hit)
     def get_issues():
         try:
-            lat = float(request.args.get('lat', 12.9716))
-            lng = float(request.args.get('lng', 77.5946))
-            radius = float(request.args.get('radius', 5)) * 1000
+            lat, lng, radius, status, category = issues_query_args()
+            cache_key = issues_cache_key()
+            if (body := cached_issues_body()) is not None:
+                return Response(body, mimetype='application/json')
 
-            base_query = db.session.query(Issue)
-            base_query = base_query.filter(
+            # PostgreSQL renders each row as JSON text, so no ORM objects are built
+            query = select(Issue.json_object().cast(db.Text)).where(
                 ST_DWithin(
-                    Issue.location.cast(db.geography),
-                    ST_GeogFromText(f'POINT({lng} {lat})'),
+                    Issue.location_geog,
+                    func.ST_SetSRID(func.ST_MakePoint(lng, lat), 4326).cast(Geography('POINT', srid=4326)),
                     radius
                 )
             )
 
-            if status := request.args.get('status'):
-                base_query = base_query.filter(Issue.status == status)
-            if category := request.args.get('category'):
-                base_query = base_query.filter(Issue.category == category)
+            if status:
+                query = query.where(Issue.status == status)
+            if category:
+                query = query.where(Issue.category == category)
 
-            issues = base_query.all()
-            return jsonify([issue.to_dict() for issue in issues])
+            # A plain buffered SELECT: pg8000 only emulates server-side cursors
+            # (DECLARE/FETCH/CLOSE), and the 50km radius cap bounds the result
+            rows = db.session.execute(query).scalars().all()
+            body = '[' + ','.join(rows) + ']'
+            if cache_key:
+                try:
+                    cache.set(cache_key, body, timeout=app.config['ISSUES_CACHE_TIMEOUT'])
+                except RedisError:
+                    app.logger.warning("Issues cache unavailable", exc_info=True)
+            return Response(body, mimetype='application/json')
 
         except ValueError as ve:
             app.logger.error(f"Value error: {str(ve)}")
             return jsonify({'error': 'Invalid parameters'}), 400
-        except Exception as e:
-            app.logger.error(f"Unexpected error: {str(e)}")
-            traceback.print_exc()
+        except Exception:
+            app.logger.exception("get_issues failed")
             return jsonify({'error': 'Internal server error'}), 500
 
     @app.route('/api/issues', methods=['POST'])
@@ -98,44 +207,45 @@ def create_app(config_class=config):
             if not all(field in data for field in required_fields):
                 return jsonify({'error': 'Missing required fields'}), 400
 
-            issue = Issue(
+            check_issue_fields(data['latitude'], data['longitude'], data['category'])
+
+            # Core INSERT ... RETURNING: one round-trip, no ORM unit of work
+            stmt = insert(Issue.__table__).values(
                 title=data['title'],
                 description=data['description'],
                 category=data['category'],
                 latitude=data['latitude'],
                 longitude=data['longitude'],
                 user_id=data.get('user_id')
-            )
+            ).returning(Issue.json_object())
 
-            db.session.add(issue)
+            payload = db.session.execute(stmt).scalar_one()
             db.session.commit()
-            socketio.emit('new_issue', issue.to_dict())
+            cache.set('issues:ver', time.time_ns(), timeout=0)
+            # Fan-out to connected clients happens off the request thread
+            socketio.start_background_task(socketio.emit, 'new_issue', payload)
 
-            return jsonify(issue.to_dict()), 201
+            return jsonify(payload), 201
 
         except Exception as e:
             db.session.rollback()
-            app.logger.error(f"Error creating issue: {str(e)}")
+            app.logger.exception("create_issue failed")
             return jsonify({'error': str(e)}), 500
 
-    # Initialize database
-    with app.app_context():
-        try:
-            if not inspect(db.engine).has_table('users'):
-                print("Initializing database...")
-                db.create_all()
-
-                admin = User(
-                    username='admin',
-                    email='admin@civictrack.org',
-                    password='admin123',
-                    is_admin=True
-                )
-                db.session.add(admin)
-                db.session.commit()
-                print("Database initialized successfully")
-        except Exception as e:
-            print(f"Database initialization failed: {str(e)}")
+    # Schema is managed by migrations (flask db upgrade); this only seeds data
+    @app.cli.command('seed')
+    def seed():
+        """Create the default admin account if it doesn't exist yet."""
+        stmt = pg_insert(User).values(
+            username='admin',
+            email='admin@civictrack.org',
+            password_hash=password_hasher.hash('admin123'),
+            hash_version='argon2id',
+            is_admin=True
+        ).on_conflict_do_nothing()
+        db.session.execute(stmt)
+        db.session.commit()
+        print("Database seeded successfully")
 
     return app
 
@@ -143,38 +253,30 @@ def check_database_connection(app):
     """Comprehensive test of database connectivity and features"""
     with app.app_context():
         try:
-            # 1. Basic connection test
-            db.session.execute(text('SELECT 1')).scalar()
+            # Connection, PostGIS, tables and spatial functions in one round-trip
+            row = db.session.execute(text("""
+                SELECT
+                    PostGIS_version() AS postgis_version,
+                    ARRAY(
+                        SELECT tablename FROM pg_tables WHERE schemaname = current_schema()
+                    ) AS tables,
+                    ST_DWithin(ST_GeogFromText(:point), ST_GeogFromText(:point), 1000) AS spatial_ok
+            """), {'point': 'POINT(77.5946 12.9716)'}).mappings().one()
             app.logger.info("Basic database connection successful")
-            
-            # 2. PostGIS availability test
-            postgis_version = db.session.execute(text('SELECT PostGIS_version()')).scalar()
-            app.logger.info(f"PostGIS available (version: {postgis_version})")
-            
-            # 3. Tables existence check
+            app.logger.info(f"PostGIS available (version: {row['postgis_version']})")
+
             required_tables = {'users', 'issues'}
-            inspector = inspect(db.engine)
-            existing_tables = set(inspector.get_table_names())
-            
-            missing_tables = required_tables - existing_tables
+            missing_tables = required_tables - set(row['tables'])
             if missing_tables:
                 app.logger.error(f"❌ Missing tables: {missing_tables}")
                 return False
             app.logger.info("All required tables exist")
-            
-            # 4. Spatial functions test
-            try:
-                test_point = 'POINT(77.5946 12.9716)'
-                db.session.execute(
-                    text("SELECT ST_DWithin(ST_GeogFromText(:point), ST_GeogFromText(:point), 1000)"),
-                    {'point': test_point}
-                ).scalar()
-                app.logger.info("Spatial functions working correctly")
-            except Exception as e:
-                app.logger.error(f"Spatial functions test failed: {str(e)}")
+
+            if not row['spatial_ok']:
+                app.logger.error("Spatial functions test failed")
                 return False
+            app.logger.info("Spatial functions working correctly")
 
-	     # 5. Return True if all tests passed
             return True
             
         except Exception as e:
@@ -11,14 +11,36 @@ class Config:
         raise ValueError("DATABASE_URL environment variable is required")
     
     SQLALCHEMY_TRACK_MODIFICATIONS = False
+    # No pool_pre_ping: it costs a SELECT 1 round-trip on every checkout. The
+    # trade-off is that after a database restart or failover the first query on
+    # a dead connection fails (a 500); SQLAlchemy then invalidates the whole
+    # pool, so later requests reconnect. pool_recycle retires idle connections.
+    # There is no statement cache to enable: pg8000's DB-API cursor runs every
+    # query as an unnamed PARSE/BIND/EXECUTE, so statements are never reused.
     SQLALCHEMY_ENGINE_OPTIONS = {
-        "pool_pre_ping": True,
         "pool_recycle": 300,
         "pool_size": 20,
-        "max_overflow": 10
+        "max_overflow": 10,
+        "connect_args": {
+            "application_name": "civictrack"
+        }
     }
-    CACHE_TYPE = 'SimpleCache'
+    # 'gevent' runs requests on green threads; pg8000 is pure Python, so
+    # blocking DB calls yield to the event loop instead of pinning a thread
+    SOCKETIO_ASYNC_MODE = os.getenv('SOCKETIO_ASYNC_MODE', 'threading')
+    # Relays emits through Redis so every Socket.IO server reaches its own clients
+    SOCKETIO_MESSAGE_QUEUE = os.getenv('REDIS_URL')
+    # Fixed window costs a single INCR+EXPIRE per hit; 'moving-window' uses an atomic Lua script
+    RATELIMIT_STORAGE_URI = os.getenv('REDIS_URL', 'memory://')
+    RATELIMIT_STRATEGY = os.getenv('RATELIMIT_STRATEGY', 'fixed-window')
+    # A Redis outage lets requests through rather than failing them
+    RATELIMIT_SWALLOW_ERRORS = True
+    # One Redis cache shared by all workers; per-process SimpleCache without Redis
+    CACHE_TYPE = 'RedisCache' if os.getenv('REDIS_URL') else 'SimpleCache'
+    CACHE_REDIS_URL = os.getenv('REDIS_URL')
+    CACHE_KEY_PREFIX = 'ct:'
     CACHE_DEFAULT_TIMEOUT = 300
+    ISSUES_CACHE_TIMEOUT = 30
     SECRET_KEY = os.getenv('SECRET_KEY', secrets.token_hex(32))
 
 class ProductionConfig(Config):
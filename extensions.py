@@ -1,19 +1,38 @@
+import orjson
+from flask.json.provider import JSONProvider
 from flask_sqlalchemy import SQLAlchemy
+from flask_migrate import Migrate
 from flask_login import LoginManager
 from flask_limiter import Limiter
 from flask_limiter.util import get_remote_address
 from flask_caching import Cache
 from flask_socketio import SocketIO
 
+class OrjsonProvider(JSONProvider):
+    """JSON provider backed by orjson, which serializes datetimes natively"""
+    option = orjson.OPT_NAIVE_UTC
+
+    def dumps(self, obj, **kwargs):
+        return orjson.dumps(obj, option=self.option).decode('utf-8')
+
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
+
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        return self._app.response_class(
+            orjson.dumps(obj, option=self.option), mimetype='application/json'
+        )
+
 db = SQLAlchemy(engine_options={
-    "pool_pre_ping": True,
     "pool_recycle": 300,
     "pool_size": 20,
     "max_overflow": 10,
 })
+migrate = Migrate()
 login_manager = LoginManager()
 limiter = Limiter(key_func=get_remote_address)
-cache = Cache(config={'CACHE_TYPE': 'SimpleCache'})
+cache = Cache()
 socketio = SocketIO()
 
 @login_manager.user_loader
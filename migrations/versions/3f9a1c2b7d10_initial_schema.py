@@ -0,0 +1,74 @@
+"""initial schema
+
+Revision ID: 3f9a1c2b7d10
+Revises:
+Create Date: 2026-10-15 09:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from geoalchemy2 import Geometry
+
+
+# revision identifiers, used by Alembic.
+revision = '3f9a1c2b7d10'
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.execute('CREATE EXTENSION IF NOT EXISTS postgis')
+
+    op.create_table(
+        'users',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('username', sa.String(length=64), nullable=False),
+        sa.Column('email', sa.String(length=120), nullable=False),
+        sa.Column('password_hash', sa.String(length=128), nullable=False),
+        sa.Column('hash_version', sa.String(length=10), nullable=True),
+        sa.Column('is_admin', sa.Boolean(), nullable=True),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('email'),
+        sa.UniqueConstraint('username'),
+        if_not_exists=True
+    )
+    op.create_table(
+        'issues',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('title', sa.String(length=200), nullable=False),
+        sa.Column('description', sa.Text(), nullable=False),
+        sa.Column('category', sa.String(length=50), nullable=False),
+        sa.Column('latitude', sa.Float(), nullable=False),
+        sa.Column('longitude', sa.Float(), nullable=False),
+        sa.Column('location', Geometry('POINT', srid=4326, spatial_index=False), nullable=False),
+        sa.Column('status', sa.String(length=20), nullable=False),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+        sa.Column('updated_at', sa.DateTime(timezone=True), nullable=True),
+        sa.Column('user_id', sa.Integer(), nullable=True),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='SET NULL'),
+        sa.PrimaryKeyConstraint('id'),
+        if_not_exists=True
+    )
+
+    # Databases created by the old create_all() bootstrap already have the base
+    # tables, so everything added since then is applied idempotently
+    op.execute(
+        'ALTER TABLE issues ADD COLUMN IF NOT EXISTS location_geog geography(POINT,4326) '
+        'GENERATED ALWAYS AS (location::geography) STORED'
+    )
+    op.create_index('idx_issues_location', 'issues', ['location'], postgresql_using='gist', if_not_exists=True)
+    op.create_index('idx_issues_location_geog', 'issues', ['location_geog'], postgresql_using='gist', if_not_exists=True)
+    op.create_index('ix_issues_status', 'issues', ['status'], if_not_exists=True)
+    op.create_index('ix_issues_category', 'issues', ['category'], if_not_exists=True)
+    op.execute('ANALYZE issues')
+
+
+def downgrade():
+    op.drop_index('ix_issues_category', table_name='issues')
+    op.drop_index('ix_issues_status', table_name='issues')
+    op.drop_index('idx_issues_location_geog', table_name='issues')
+    op.drop_index('idx_issues_location', table_name='issues')
+    op.drop_table('issues')
+    op.drop_table('users')
@@ -0,0 +1,31 @@
+"""issue check constraints
+
+Revision ID: 8c2e5d4a1b93
+Revises: 3f9a1c2b7d10
+Create Date: 2026-10-15 10:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '8c2e5d4a1b93'
+down_revision = '3f9a1c2b7d10'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_check_constraint(
+        'ck_issues_category', 'issues',
+        "category IN ('garbage', 'lighting', 'obstructions', 'roads', 'safety', 'water')"
+    )
+    op.create_check_constraint('ck_issues_latitude', 'issues', 'latitude BETWEEN -90 AND 90')
+    op.create_check_constraint('ck_issues_longitude', 'issues', 'longitude BETWEEN -180 AND 180')
+
+
+def downgrade():
+    op.drop_constraint('ck_issues_longitude', 'issues', type_='check')
+    op.drop_constraint('ck_issues_latitude', 'issues', type_='check')
+    op.drop_constraint('ck_issues_category', 'issues', type_='check')
@@ -0,0 +1,47 @@
+"""generate issue location from latitude/longitude
+
+Revision ID: b71f0e93c4d2
+Revises: 8c2e5d4a1b93
+Create Date: 2026-10-15 11:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b71f0e93c4d2'
+down_revision = '8c2e5d4a1b93'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # PostgreSQL can't turn an existing column into a generated one, and generated
+    # columns can't reference each other, so both are rebuilt from the coordinates
+    op.drop_column('issues', 'location_geog')
+    op.drop_column('issues', 'location')
+    op.execute(
+        'ALTER TABLE issues ADD COLUMN location geometry(POINT,4326) NOT NULL '
+        'GENERATED ALWAYS AS (ST_SetSRID(ST_MakePoint(longitude, latitude), 4326)) STORED'
+    )
+    op.execute(
+        'ALTER TABLE issues ADD COLUMN location_geog geography(POINT,4326) '
+        'GENERATED ALWAYS AS (ST_SetSRID(ST_MakePoint(longitude, latitude), 4326)::geography) STORED'
+    )
+    op.create_index('idx_issues_location', 'issues', ['location'], postgresql_using='gist')
+    op.create_index('idx_issues_location_geog', 'issues', ['location_geog'], postgresql_using='gist')
+
+
+def downgrade():
+    op.drop_column('issues', 'location_geog')
+    op.drop_column('issues', 'location')
+    op.execute('ALTER TABLE issues ADD COLUMN location geometry(POINT,4326)')
+    op.execute('UPDATE issues SET location = ST_SetSRID(ST_MakePoint(longitude, latitude), 4326)')
+    op.alter_column('issues', 'location', nullable=False)
+    op.execute(
+        'ALTER TABLE issues ADD COLUMN location_geog geography(POINT,4326) '
+        'GENERATED ALWAYS AS (location::geography) STORED'
+    )
+    op.create_index('idx_issues_location', 'issues', ['location'], postgresql_using='gist')
+    op.create_index('idx_issues_location_geog', 'issues', ['location_geog'], postgresql_using='gist')
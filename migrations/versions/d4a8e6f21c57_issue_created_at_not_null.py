@@ -0,0 +1,25 @@
+"""issue created_at not null
+
+Revision ID: d4a8e6f21c57
+Revises: b71f0e93c4d2
+Create Date: 2026-10-15 12:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'd4a8e6f21c57'
+down_revision = 'b71f0e93c4d2'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.execute('UPDATE issues SET created_at = now() WHERE created_at IS NULL')
+    op.alter_column('issues', 'created_at', existing_type=sa.DateTime(timezone=True), nullable=False)
+
+
+def downgrade():
+    op.alter_column('issues', 'created_at', existing_type=sa.DateTime(timezone=True), nullable=True)
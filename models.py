@@ -1,38 +1,88 @@
-from datetime import datetime
+import sys
+from datetime import datetime, timezone
 from extensions import db
-from geoalchemy2 import Geometry
+from geoalchemy2 import Geometry, Geography
 from flask_login import UserMixin
-from bcrypt import hashpw, gensalt, checkpw
+from argon2 import PasswordHasher
+from argon2.exceptions import InvalidHashError, VerificationError
+from bcrypt import checkpw
 from sqlalchemy import func, event
+from sqlalchemy.dialects.postgresql import JSONB
+
+def utcnow():
+    return datetime.now(timezone.utc)
+
+VALID_CATEGORIES = frozenset({'roads', 'water', 'garbage', 'lighting', 'safety', 'obstructions'})
+
+# argon2id: 64 MiB over two lanes, two passes
+password_hasher = PasswordHasher(time_cost=2, memory_cost=65536, parallelism=2)
+
+def run_blocking(fn, *args):
+    """Run CPU-bound work on gevent's native threadpool when gevent is active"""
+    # Under gevent a hash blocks the whole hub even though it releases the GIL;
+    # the threadpool runs it on a real OS thread so other greenlets keep going.
+    # Keyed on the actual patch state, not the environment, so an unpatched
+    # process never touches a hub.
+    if 'gevent' in sys.modules:
+        from gevent import get_hub, monkey
+        if monkey.is_module_patched('threading'):
+            return get_hub().threadpool.apply(fn, args)
+    return fn(*args)
 
 class Issue(db.Model):
     __tablename__ = 'issues'
+    # Mirrors validate_issue so rows written outside the session are checked too
+    __table_args__ = (
+        db.CheckConstraint(
+            'category IN (%s)' % ', '.join(f"'{c}'" for c in sorted(VALID_CATEGORIES)),
+            name='ck_issues_category'
+        ),
+        db.CheckConstraint('latitude BETWEEN -90 AND 90', name='ck_issues_latitude'),
+        db.CheckConstraint('longitude BETWEEN -180 AND 180', name='ck_issues_longitude'),
+    )
 
     id = db.Column(db.Integer, primary_key=True)
     title = db.Column(db.String(200), nullable=False)
     description = db.Column(db.Text, nullable=False)
-    category = db.Column(db.String(50), nullable=False)
+    category = db.Column(db.String(50), nullable=False, index=True)
     latitude = db.Column(db.Float, nullable=False)
     longitude = db.Column(db.Float, nullable=False)
-    location = db.Column(Geometry('POINT', srid=4326), nullable=False)
-    status = db.Column(db.String(20), default='reported', nullable=False)
-    created_at = db.Column(db.DateTime(timezone=True), server_default=func.now())
-    updated_at = db.Column(db.DateTime(timezone=True), onupdate=func.now())
+    # Both point columns are generated by PostgreSQL from latitude/longitude, so
+    # they are never written from Python and can't drift from the coordinates.
+    # location_geog is a stored geography copy so ST_DWithin can use a GiST index
+    # (spatial_index is on by default) instead of casting every row.
+    location = db.Column(
+        Geometry('POINT', srid=4326),
+        db.Computed('ST_SetSRID(ST_MakePoint(longitude, latitude), 4326)', persisted=True),
+        nullable=False
+    )
+    location_geog = db.Column(
+        Geography('POINT', srid=4326),
+        db.Computed('ST_SetSRID(ST_MakePoint(longitude, latitude), 4326)::geography', persisted=True)
+    )
+    status = db.Column(db.String(20), default='reported', nullable=False, index=True)
+    # Timestamps travel in the INSERT/UPDATE itself; server_default only covers
+    # rows written outside the app
+    created_at = db.Column(db.DateTime(timezone=True), default=utcnow, server_default=func.now(), nullable=False)
+    updated_at = db.Column(db.DateTime(timezone=True), onupdate=utcnow)
     user_id = db.Column(db.Integer, db.ForeignKey('users.id', ondelete='SET NULL'))
 
-    def to_dict(self):
-        return {
-            'id': self.id,
-            'title': self.title,
-            'description': self.description,
-            'category': self.category,
-            'latitude': self.latitude,
-            'longitude': self.longitude,
-            'status': self.status,
-            'created_at': self.created_at.isoformat() if self.created_at else None,
-            'updated_at': self.updated_at.isoformat() if self.updated_at else None,
-            'user_id': self.user_id
-        }
+    @classmethod
+    def json_object(cls):
+        """SQL expression building the API representation of an issue as jsonb in PostgreSQL"""
+        return func.jsonb_build_object(
+            'id', cls.id,
+            'title', cls.title,
+            'description', cls.description,
+            'category', cls.category,
+            'latitude', cls.latitude,
+            'longitude', cls.longitude,
+            'status', cls.status,
+            'created_at', cls.created_at,
+            'updated_at', cls.updated_at,
+            'user_id', cls.user_id,
+            type_=JSONB
+        )
 
 class User(db.Model, UserMixin):
     __tablename__ = 'users'
@@ -41,7 +91,7 @@ class User(db.Model, UserMixin):
     username = db.Column(db.String(64), unique=True, nullable=False)
     email = db.Column(db.String(120), unique=True, nullable=False)
     password_hash = db.Column(db.String(128), nullable=False)
-    hash_version = db.Column(db.String(10), default='bcrypt12', nullable=True)
+    hash_version = db.Column(db.String(10), default='argon2id', nullable=True)
     is_admin = db.Column(db.Boolean, default=False)
     created_at = db.Column(db.DateTime(timezone=True), server_default=func.now())
 
@@ -51,26 +101,36 @@ class User(db.Model, UserMixin):
 
     @password.setter
     def password(self, password):
-        self.password_hash = hashpw(
-            password.encode('utf-8'), 
-            gensalt(rounds=12)
-        ).decode('utf-8')
-        self.hash_version = 'bcrypt12'
+        self.password_hash = run_blocking(password_hasher.hash, password)
+        self.hash_version = 'argon2id'
 
     def verify_password(self, password):
-        return checkpw(
-            password.encode('utf-8'),
-            self.password_hash.encode('utf-8')
-        )
+        if self.hash_version == 'argon2id':
+            try:
+                run_blocking(password_hasher.verify, self.password_hash, password)
+            except (VerificationError, InvalidHashError):
+                return False
+            if password_hasher.check_needs_rehash(self.password_hash):
+                self.password = password
+            return True
 
-@event.listens_for(Issue, 'before_insert')
-@event.listens_for(Issue, 'before_update')
-def validate_issue(mapper, connection, target):
+        # Legacy bcrypt hash: upgrade to argon2id once the password is known good
+        if not run_blocking(checkpw, password.encode('utf-8'), self.password_hash.encode('utf-8')):
+            return False
+        self.password = password
+        return True
+
+def check_issue_fields(latitude, longitude, category):
+    """Raise ValueError if an issue's coordinates or category are invalid"""
     # Validate coordinates
-    if not (-90 <= target.latitude <= 90 and -180 <= target.longitude <= 180):
+    if not (-90 <= latitude <= 90 and -180 <= longitude <= 180):
         raise ValueError("Coordinates out of valid range (-90 to 90 lat, -180 to 180 lng)")
     
     # Validate category
-    valid_categories = ['roads', 'water', 'garbage', 'lighting', 'safety', 'obstructions']
-    if target.category not in valid_categories:
-        raise ValueError(f"Invalid category. Must be one of: {valid_categories}")
\ No newline at end of file
+    if category not in VALID_CATEGORIES:
+        raise ValueError(f"Invalid category. Must be one of: {sorted(VALID_CATEGORIES)}")
+
+@event.listens_for(Issue, 'before_insert')
+@event.listens_for(Issue, 'before_update')
+def validate_issue(mapper, connection, target):
+    check_issue_fields(target.latitude, target.longitude, target.category)